@@ -0,0 +1,63 @@
+"""On-disk caching of metadata between runs."""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from .utils import ensure_directory
+
+
+class MetadataCache:
+    """Caches JSON metadata on disk, keyed by URL, with a time-to-live."""
+
+    def __init__(self, cache_dir: Path, ttl: float = 24 * 60 * 60):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+            ttl: Maximum age of a cache entry in seconds (default: 24 hours)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+
+    def _entry_path(self, key: str) -> Path:
+        """Get the cache file path for a key."""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Load a cached entry.
+
+        Args:
+            key: Cache key (e.g. a playlist URL)
+
+        Returns:
+            The cached metadata, or None if missing, expired, or unreadable
+        """
+        path = self._entry_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        """
+        Store an entry in the cache.
+
+        Args:
+            key: Cache key (e.g. a playlist URL)
+            value: JSON-serializable metadata
+        """
+        ensure_directory(self.cache_dir)
+        path = self._entry_path(key)
+        # Write to a temp file first so a crash never leaves a truncated entry
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(value), encoding="utf-8")
+        os.replace(tmp_path, path)
@@ -1,6 +1,9 @@
 """Command-line interface for streamstofiles."""
 
+import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import date
 from pathlib import Path
 from typing import Any
@@ -17,6 +20,15 @@ from .concatenator import AudioConcatenator
 # Default playlist URL
 DEFAULT_PLAYLIST = "https://www.youtube.com/watch?v=LZmtl3l1R9A&list=PLW7vZQVayoR0wLs2ahN7h774_XsD-dp-2"
 
+# Numbered track files like "01-Title.mp3", "02-Title.mp3", etc.
+_TRACK_RE = re.compile(r"^(\d+)-(.+)\.mp3$")
+
+# Concatenated files that are not individual tracks
+_SKIP_SUFFIXES = ("_complete.mp3", "_randomized.mp3")
+
+# Sidecar file caching track info so existing tracks can be rescanned without opening each MP3
+TRACKS_MANIFEST = "tracks.json"
+
 
 @click.command()
 @click.argument("playlist_url", default=DEFAULT_PLAYLIST, required=False)
@@ -36,8 +48,20 @@ DEFAULT_PLAYLIST = "https://www.youtube.com/watch?v=LZmtl3l1R9A&list=PLW7vZQVayo
 )
 @click.option(
     "--update-tags/--no-update-tags",
-    default=True,
-    help="Update ID3 tags after download (default: enabled)",
+    default=False,
+    help="Rewrite ID3 tags with mutagen after download; tags are already embedded while downloading (default: disabled)",
+)
+@click.option(
+    "--force-redownload",
+    is_flag=True,
+    default=False,
+    help="Download every track again, even if its MP3 already exists (also refreshes playlist info)",
+)
+@click.option(
+    "--refresh-playlist",
+    is_flag=True,
+    default=False,
+    help="Fetch playlist info again instead of using the copy cached for up to 24 hours",
 )
 @click.option(
     "--concatenate/--no-concatenate",
@@ -49,6 +73,8 @@ def main(
     output_dir: Path,
     quality: str,
     update_tags: bool,
+    force_redownload: bool,
+    refresh_playlist: bool,
     concatenate: bool,
 ) -> None:
     """
@@ -78,32 +104,59 @@ def main(
 
     try:
         # Initialize downloader
-        downloader = PlaylistDownloader(output_dir, quality)
-
-        # Download playlist
-        click.echo("Downloading playlist...")
-        result = downloader.download_playlist(playlist_url)
-
-        click.echo(f"\n\nDownload complete!")
-        click.echo(f"Playlist: {result['playlist_title']}")
-        downloaded = len(result['files'])
-        total = result['total_tracks']
-        failed = total - downloaded
-        pct = (downloaded / total * 100) if total > 0 else 0
-        click.echo(f"Downloaded: {downloaded}/{total} tracks ({pct:.0f}%)")
-        if failed > 0:
-            click.echo(f"Failed: {failed} tracks")
-        click.echo(f"Output directory: {result['playlist_dir']}")
-        click.echo()
+        downloader = PlaylistDownloader(
+            output_dir,
+            quality,
+            force_redownload=force_redownload,
+            refresh_playlist=refresh_playlist,
+        )
 
-        # Update ID3 tags if requested
-        if update_tags and result["files"]:
-            click.echo("Updating ID3 tags...")
-            for file_info in result["files"]:
-                ID3Tagger.update_tags(file_info["path"], file_info)
-                click.echo(f"  ✓ Updated tags for: {file_info['path'].name}")
+        # Tag each file as soon as it is downloaded so tagging overlaps
+        # with the remaining downloads instead of running after them.
+        # mutagen's tag writing is CPU-bound Python, so use processes
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as tag_executor:
+            tag_futures = {}
+
+            def on_file_downloaded(file_info: dict[str, Any]) -> None:
+                if update_tags:
+                    # Pass a copy so the override flag doesn't end up in tracks.json
+                    future = tag_executor.submit(
+                        ID3Tagger.update_tags, file_info["path"], {**file_info, "needs_override": True}
+                    )
+                    tag_futures[future] = file_info
+
+            # Download playlist
+            click.echo("Downloading playlist...")
+            result = downloader.download_playlist(playlist_url, on_file=on_file_downloaded)
+
+            click.echo(f"\n\nDownload complete!")
+            click.echo(f"Playlist: {result['playlist_title']}")
+            downloaded = len(result['files'])
+            total = result['total_tracks']
+            failed = total - downloaded
+            pct = (downloaded / total * 100) if total > 0 else 0
+            click.echo(f"Downloaded: {downloaded}/{total} tracks ({pct:.0f}%)")
+            if failed > 0:
+                click.echo(f"Failed: {failed} tracks")
+            click.echo(f"Output directory: {result['playlist_dir']}")
             click.echo()
 
+            # Wait for the ID3 tag updates started during the download
+            if tag_futures:
+                click.echo("Updating ID3 tags...")
+                for future in as_completed(tag_futures):
+                    file_info = tag_futures[future]
+                    try:
+                        future.result()
+                        click.echo(f"  ✓ Updated tags for: {file_info['path'].name}")
+                    except Exception as e:
+                        click.echo(f"  ✗ Failed to update tags for {file_info['path'].name}: {e}", err=True)
+                click.echo()
+
+        # Cache track info next to the files for later rescans
+        if result["files"]:
+            write_tracks_manifest(result["playlist_dir"], result["files"])
+
         # Generate m3u playlist
         if result["files"]:
             click.echo("Generating m3u playlist...")
@@ -116,29 +169,38 @@ def main(
         concat_info = None
         randomized_concat_info = None
         if concatenate and result["files"]:
-            click.echo("Concatenating audio files...")
             concat_filename = f"{result['playlist_dir'].name}_complete.mp3"
             concat_path = result["playlist_dir"] / concat_filename
-            concat_info = AudioConcatenator.concatenate_files(
-                result["files"],
-                concat_path,
-                quality
-            )
-            click.echo(f"  ✓ Created concatenated file: {concat_path.name}")
-            click.echo(f"  ✓ Total duration: {AudioConcatenator._format_timestamp(concat_info['total_duration'])}")
-            click.echo()
-
-            # Create randomized concatenation
-            click.echo("Creating randomized concatenation...")
             today = date.today().isoformat()
             randomized_filename = f"{result['playlist_dir'].name}_randomized_{today}.mp3"
             randomized_path = result["playlist_dir"] / randomized_filename
-            randomized_concat_info = AudioConcatenator.concatenate_files_randomized(
-                result["files"],
-                randomized_path,
-                quality
-            )
-            click.echo(f"  ✓ Created randomized file: {randomized_path.name}")
+
+            # The ordered and randomized files are independent ffmpeg runs over the
+            # same inputs, so run them side by side
+            click.echo("Concatenating audio files (ordered and randomized)...")
+            with ThreadPoolExecutor(max_workers=2) as concat_executor:
+                concat_future = concat_executor.submit(
+                    AudioConcatenator.concatenate_files_parallel,
+                    result["files"],
+                    concat_path,
+                    quality,
+                )
+                randomized_future = concat_executor.submit(
+                    AudioConcatenator.concatenate_files_randomized,
+                    result["files"],
+                    randomized_path,
+                    quality,
+                    # Seed with the date so the same day's shuffle is reproducible
+                    seed=date.today().toordinal(),
+                )
+                for future in as_completed([concat_future, randomized_future]):
+                    if future is concat_future:
+                        concat_info = future.result()
+                        click.echo(f"  ✓ Created concatenated file: {concat_path.name}")
+                        click.echo(f"  ✓ Total duration: {AudioConcatenator._format_timestamp(concat_info['total_duration'])}")
+                    else:
+                        randomized_concat_info = future.result()
+                        click.echo(f"  ✓ Created randomized file: {randomized_path.name}")
 
             # Generate track listing for randomized version
             tracklist_filename = f"randomized_tracklist_{today}.txt"
@@ -180,6 +242,97 @@ def main(
         raise click.Abort()
 
 
+def _probe_one(mp3_file: Path) -> dict[str, Any] | None:
+    """
+    Read track info from a numbered MP3 file.
+
+    Args:
+        mp3_file: Path to an MP3 file named like "01-Title.mp3"
+
+    Returns:
+        File info dictionary, or None if the file is not a readable track
+    """
+    match = _TRACK_RE.match(mp3_file.name)
+    if not match:
+        return None
+
+    track_num = int(match.group(1))
+    try:
+        # Get duration from the MP3 file
+        audio = MP3(mp3_file)
+        duration = int(audio.info.length)
+
+        # Get title from ID3 tags or filename
+        title = match.group(2).replace("_", " ")
+        if audio.tags and "TIT2" in audio.tags:
+            title = str(audio.tags["TIT2"])
+
+        return {
+            "path": mp3_file,
+            "title": title,
+            "duration": duration,
+            "track_number": track_num,
+        }
+    except Exception as e:
+        click.echo(f"  Warning: Could not read {mp3_file.name}: {e}", err=True)
+        return None
+
+
+def write_tracks_manifest(directory: Path, files: list[dict[str, Any]]) -> Path:
+    """
+    Write a sidecar JSON file with the info for each downloaded track.
+
+    Args:
+        directory: Path to the playlist directory
+        files: List of file info dictionaries
+
+    Returns:
+        Path to the created manifest file
+    """
+    manifest_path = directory / TRACKS_MANIFEST
+    # Store file names rather than full paths so the directory can be moved
+    tracks = [
+        {
+            key: value.name if isinstance(value, Path) else value
+            for key, value in file_info.items()
+            if key != "abs_path_str"
+        }
+        for file_info in files
+    ]
+    manifest_path.write_text(json.dumps(tracks, indent=2), encoding="utf-8")
+    return manifest_path
+
+
+def _load_tracks_manifest(directory: Path, track_names: set[str]) -> list[dict[str, Any]] | None:
+    """
+    Load cached track info, if it matches the numbered tracks in the directory.
+
+    Args:
+        directory: Path to the playlist directory
+        track_names: File names of the numbered MP3 tracks in the directory
+
+    Returns:
+        List of file info dictionaries, or None if the manifest is missing or stale
+    """
+    manifest_path = directory / TRACKS_MANIFEST
+    if not manifest_path.exists():
+        return None
+
+    try:
+        tracks = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if {track["path"] for track in tracks} != track_names:
+            return None
+        # yt-dlp durations can be missing or fractional; the timestamps need
+        # whole seconds like a probe gives, so probe those tracks instead
+        if any(type(track.get("duration")) is not int for track in tracks):
+            return None
+        for track in tracks:
+            track["path"] = directory / track["path"]
+        return tracks
+    except Exception:
+        return None
+
+
 def scan_existing_tracks(directory: Path) -> list[dict[str, Any]]:
     """
     Scan a directory for existing numbered MP3 track files.
@@ -190,37 +343,21 @@ def scan_existing_tracks(directory: Path) -> list[dict[str, Any]]:
     Returns:
         List of file info dictionaries sorted by track number
     """
-    files = []
-    # Match files like "01-Title.mp3", "02-Title.mp3", etc.
     # Exclude concatenated files (*_complete.mp3, *_randomized.mp3)
-    pattern = re.compile(r"^(\d+)-(.+)\.mp3$")
-
-    for mp3_file in directory.glob("*.mp3"):
-        # Skip concatenated files
-        if mp3_file.name.endswith("_complete.mp3") or mp3_file.name.endswith("_randomized.mp3"):
-            continue
-
-        match = pattern.match(mp3_file.name)
-        if match:
-            track_num = int(match.group(1))
-            try:
-                # Get duration from the MP3 file
-                audio = MP3(mp3_file)
-                duration = int(audio.info.length)
-
-                # Get title from ID3 tags or filename
-                title = match.group(2).replace("_", " ")
-                if audio.tags and "TIT2" in audio.tags:
-                    title = str(audio.tags["TIT2"])
-
-                files.append({
-                    "path": mp3_file,
-                    "title": title,
-                    "duration": duration,
-                    "track_number": track_num,
-                })
-            except Exception as e:
-                click.echo(f"  Warning: Could not read {mp3_file.name}: {e}", err=True)
+    candidates = [
+        mp3_file
+        for mp3_file in directory.glob("*.mp3")
+        if not mp3_file.name.endswith(_SKIP_SUFFIXES)
+    ]
+
+    # Use the cached track info when it still matches the files on disk
+    track_names = {mp3_file.name for mp3_file in candidates if _TRACK_RE.match(mp3_file.name)}
+    files = _load_tracks_manifest(directory, track_names)
+
+    if files is None:
+        # Reading MP3 headers is I/O bound, so probe the files concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            files = [f for f in executor.map(_probe_one, candidates) if f is not None]
 
     # Sort by track number
     files.sort(key=lambda x: x["track_number"])
@@ -243,8 +380,8 @@ def rerandomize(directory: Path, quality: str) -> None:
     DIRECTORY: Path to a playlist directory containing numbered MP3 files
 
     This command scans an existing playlist directory for numbered track files
-    (e.g., 01-Title.mp3, 02-Title.mp3), validates they exist, and creates a new
-    randomized concatenation with a fresh track listing.
+    (e.g., 01-Title.mp3, 02-Title.mp3) and creates a new randomized
+    concatenation with a fresh track listing.
 
     Examples:
 
@@ -276,17 +413,6 @@ def rerandomize(directory: Path, quality: str) -> None:
             click.echo(f"    {f['track_number']:02d}. {f['title']} ({AudioConcatenator._format_timestamp(f['duration'])})")
         click.echo()
 
-        # Validate all files exist and are readable
-        click.echo("Validating files...")
-        missing_files = [f for f in files if not f["path"].exists()]
-        if missing_files:
-            click.echo("Error: The following files are missing:", err=True)
-            for f in missing_files:
-                click.echo(f"  - {f['path']}", err=True)
-            raise click.Abort()
-        click.echo("  ✓ All files validated")
-        click.echo()
-
         # Get playlist title from directory name
         playlist_title = directory.name.replace("_", " ")
 
@@ -1,11 +1,16 @@
 """Audio file concatenation for creating single long-form files."""
 
+import math
+import os
 import random
 import subprocess
 from datetime import datetime
+from itertools import accumulate
 from pathlib import Path
 from typing import Any
 
+from mutagen.mp3 import MP3
+
 
 class AudioConcatenator:
     """Concatenates multiple audio files into a single long file."""
@@ -15,6 +20,7 @@ class AudioConcatenator:
         file_list: list[dict[str, Any]],
         output_path: Path,
         quality: str = "192",
+        stream_copy: bool | None = None,
     ) -> dict[str, Any]:
         """
         Concatenate multiple audio files into a single MP3 file.
@@ -23,6 +29,7 @@ class AudioConcatenator:
             file_list: List of file info dictionaries with 'path' and 'duration'
             output_path: Path for the output concatenated file
             quality: MP3 quality in kbps
+            stream_copy: Whether to skip re-encoding (detected from the files if None)
 
         Returns:
             Dictionary with concatenation info including timestamps
@@ -33,38 +40,143 @@ class AudioConcatenator:
         # Calculate timestamps for each track in the concatenated file
         timestamps = AudioConcatenator._calculate_timestamps(file_list)
 
-        # Create a temporary file list for ffmpeg concat demuxer
-        concat_list_path = output_path.parent / "concat_list.txt"
+        if stream_copy is None:
+            stream_copy = AudioConcatenator._can_stream_copy(file_list)
+
+        # Create a temporary file list for ffmpeg concat demuxer, named after the
+        # output so concurrent concatenations in one directory don't collide
+        concat_list_path = output_path.parent / f"{output_path.stem}_concat_list.txt"
         AudioConcatenator._create_concat_list(file_list, concat_list_path)
 
         try:
-            # Concatenate using ffmpeg concat demuxer and convert to MP3
-            # This approach is efficient as it doesn't re-encode unnecessarily
-            temp_output = output_path.parent / f"{output_path.stem}_temp.mp3"
+            # Concatenate using ffmpeg concat demuxer
+            if stream_copy:
+                # All inputs share the same encoding, so just mux the packets
+                codec_args = ["-c:a", "copy"]
+            else:
+                # Mixed encodings, re-encode to a uniform MP3 stream
+                codec_args = AudioConcatenator._encode_args(quality)
+
+            AudioConcatenator._run_ffmpeg([
+                "ffmpeg",
+                "-loglevel", "error",  # Only errors are kept from stderr
+                "-f", "concat",
+                "-safe", "0",
+                "-i", str(concat_list_path),
+                *codec_args,
+                "-y",  # Overwrite output file
+                str(output_path),
+            ])
 
-            subprocess.run(
-                [
+        finally:
+            # Clean up temporary concat list file
+            if concat_list_path.exists():
+                concat_list_path.unlink()
+
+        return {
+            "path": output_path,
+            "timestamps": timestamps,
+            "total_duration": timestamps[-1]["end"] if timestamps else 0,
+        }
+
+    @staticmethod
+    def concatenate_files_parallel(
+        file_list: list[dict[str, Any]],
+        output_path: Path,
+        quality: str = "192",
+        jobs: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Concatenate audio files, re-encoding in parallel shards when needed.
+
+        When the files can be stream-copied this is the same as concatenate_files.
+        Otherwise the list is split into contiguous shards that are re-encoded by
+        concurrent ffmpeg processes and then joined without further re-encoding.
+
+        Args:
+            file_list: List of file info dictionaries with 'path' and 'duration'
+            output_path: Path for the output concatenated file
+            quality: MP3 quality in kbps
+            jobs: Number of parallel ffmpeg processes (default: CPU count)
+
+        Returns:
+            Dictionary with concatenation info including timestamps
+        """
+        if not file_list:
+            raise ValueError("No files to concatenate")
+
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(file_list)))
+        stream_copy = AudioConcatenator._can_stream_copy(file_list)
+        if stream_copy or jobs == 1:
+            return AudioConcatenator.concatenate_files(
+                file_list, output_path, quality, stream_copy=stream_copy
+            )
+
+        # Timestamps come from the original ordered list so offsets match
+        timestamps = AudioConcatenator._calculate_timestamps(file_list)
+
+        shard_size = math.ceil(len(file_list) / jobs)
+        shards = [file_list[i:i + shard_size] for i in range(0, len(file_list), shard_size)]
+        shard_lists = []
+        shard_outputs = []
+        processes = []
+
+        # Every shard is resampled to the first file's format, otherwise each keeps
+        # that of its own first input and the shards couldn't be stream-copied together
+        first = MP3(file_list[0]["path"]).info
+        format_args = ["-ar", str(first.sample_rate), "-ac", str(first.channels)]
+
+        try:
+            # Re-encode each shard in its own ffmpeg process
+            for idx, shard in enumerate(shards):
+                shard_list_path = output_path.parent / f"{output_path.stem}_shard_{idx}.txt"
+                shard_output = output_path.parent / f"{output_path.stem}_shard_{idx}.mp3"
+                AudioConcatenator._create_concat_list(shard, shard_list_path)
+                shard_lists.append(shard_list_path)
+                shard_outputs.append(shard_output)
+
+                args = [
                     "ffmpeg",
+                    "-loglevel", "error",
                     "-f", "concat",
                     "-safe", "0",
-                    "-i", str(concat_list_path),
-                    "-c:a", "libmp3lame",
-                    "-b:a", f"{quality}k",
-                    "-y",  # Overwrite output file
-                    str(temp_output),
-                ],
-                check=True,
-                capture_output=True,
-                text=True,
+                    "-i", str(shard_list_path),
+                    *AudioConcatenator._encode_args(quality),
+                    *format_args,
+                    "-y",
+                    str(shard_output),
+                ]
+                processes.append(subprocess.Popen(
+                    args,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                ))
+
+            # Wait for every shard before checking, so none is still writing on cleanup
+            errors = [process.communicate()[1] for process in processes]
+            for process, stderr in zip(processes, errors):
+                if process.returncode != 0:
+                    raise RuntimeError(f"ffmpeg failed: {AudioConcatenator._stderr_tail(stderr)}")
+
+            # The shards now share one encoding, so join them with a stream copy
+            AudioConcatenator.concatenate_files(
+                [{"path": shard_output} for shard_output in shard_outputs],
+                output_path,
+                quality,
+                stream_copy=True,
             )
 
-            # Move to final location
-            temp_output.rename(output_path)
-
         finally:
-            # Clean up temporary concat list file
-            if concat_list_path.exists():
-                concat_list_path.unlink()
+            # Stop shards still running after a failure before removing their files
+            for process in processes:
+                if process.poll() is None:
+                    process.kill()
+                    process.communicate()
+
+            # Clean up shard concat lists and intermediate shard files
+            for path in shard_lists + shard_outputs:
+                if path.exists():
+                    path.unlink()
 
         return {
             "path": output_path,
@@ -72,6 +184,85 @@ class AudioConcatenator:
             "total_duration": timestamps[-1]["end"] if timestamps else 0,
         }
 
+    @staticmethod
+    def _encode_args(quality: str) -> list[str]:
+        """
+        Build the ffmpeg arguments for re-encoding to MP3.
+
+        Args:
+            quality: MP3 quality in kbps
+
+        Returns:
+            List of ffmpeg codec arguments
+        """
+        return [
+            "-c:a", "libmp3lame",
+            "-b:a", f"{quality}k",
+            "-threads", "0",
+            # LAME algorithm quality: 0 is slowest/best, 9 fastest (default 3)
+            "-compression_level", "5",
+        ]
+
+    @staticmethod
+    def _run_ffmpeg(args: list[str]) -> None:
+        """
+        Run an ffmpeg command, discarding its output unless it fails.
+
+        Args:
+            args: ffmpeg command line
+
+        Raises:
+            RuntimeError: If ffmpeg exits with an error
+        """
+        try:
+            subprocess.run(
+                args,
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"ffmpeg failed: {AudioConcatenator._stderr_tail(e.stderr)}") from e
+
+    @staticmethod
+    def _stderr_tail(stderr: bytes | None, limit: int = 4096) -> str:
+        """
+        Decode the last part of ffmpeg's stderr for an error message.
+
+        Args:
+            stderr: Raw stderr output
+            limit: Maximum number of trailing bytes to keep
+
+        Returns:
+            Decoded stderr tail
+        """
+        if not stderr:
+            return "no error output"
+        return stderr[-limit:].decode("utf-8", errors="replace").strip()
+
+    @staticmethod
+    def _can_stream_copy(file_list: list[dict[str, Any]]) -> bool:
+        """
+        Check whether all files can be concatenated without re-encoding.
+
+        Args:
+            file_list: List of file info dictionaries with 'path'
+
+        Returns:
+            True if every file is an MP3 with the same MPEG version, layer,
+            bitrate, sample rate and channel count
+        """
+        formats = set()
+        for file_info in file_list:
+            try:
+                info = MP3(file_info["path"]).info
+            except Exception:
+                return False
+            formats.add((info.version, info.layer, info.bitrate, info.sample_rate, info.channels))
+            if len(formats) > 1:
+                return False
+        return True
+
     @staticmethod
     def _calculate_timestamps(file_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """
@@ -83,26 +274,24 @@ class AudioConcatenator:
         Returns:
             List of timestamp dictionaries with start, end, and formatted times
         """
-        timestamps = []
-        current_time = 0
-
-        for idx, file_info in enumerate(file_list, start=1):
-            duration = file_info.get("duration", 0)
-            start_time = current_time
-            end_time = current_time + duration
+        durations = [file_info.get("duration", 0) for file_info in file_list]
+        # Running total of durations gives each track's end time
+        ends = list(accumulate(durations))
+        format_timestamp = AudioConcatenator._format_timestamp
 
+        timestamps = []
+        for idx, (file_info, duration, end_time) in enumerate(zip(file_list, durations, ends), start=1):
+            start_time = end_time - duration
             timestamps.append({
                 "track_number": idx,
                 "title": file_info.get("title", "Unknown"),
                 "start": start_time,
                 "end": end_time,
-                "start_formatted": AudioConcatenator._format_timestamp(start_time),
-                "end_formatted": AudioConcatenator._format_timestamp(end_time),
+                "start_formatted": format_timestamp(start_time),
+                "end_formatted": format_timestamp(end_time),
                 "duration": duration,
             })
 
-            current_time = end_time
-
         return timestamps
 
     @staticmethod
@@ -116,11 +305,24 @@ class AudioConcatenator:
         Returns:
             Formatted timestamp string
         """
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
+        hours, remainder = divmod(seconds, 3600)
+        minutes, secs = divmod(remainder, 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
+    @staticmethod
+    def _abs_path(file_info: dict[str, Any]) -> str:
+        """
+        Get the absolute path of a file as a string.
+
+        Args:
+            file_info: File info dictionary with 'path' and optionally 'abs_path_str'
+
+        Returns:
+            Absolute path string, precomputed by the downloader when available
+        """
+        # os.path.abspath is a pure string operation, no stat needed
+        return file_info.get("abs_path_str") or os.path.abspath(file_info["path"])
+
     @staticmethod
     def _create_concat_list(file_list: list[dict[str, Any]], output_path: Path) -> None:
         """
@@ -130,20 +332,20 @@ class AudioConcatenator:
             file_list: List of file info dictionaries with 'path'
             output_path: Path where the concat list file should be created
         """
-        lines = []
-        for file_info in file_list:
-            file_path = file_info["path"]
-            # Use absolute path and escape single quotes
-            abs_path = str(file_path.absolute()).replace("'", "'\\''")
-            lines.append(f"file '{abs_path}'")
-
-        output_path.write_text("\n".join(lines), encoding="utf-8")
+        with open(output_path, "wb", buffering=65536) as f:
+            for file_info in file_list:
+                # Use absolute path and escape single quotes
+                abs_path = AudioConcatenator._abs_path(file_info).replace("'", "'\\''")
+                f.write(b"file '")
+                f.write(abs_path.encode("utf-8"))
+                f.write(b"'\n")
 
     @staticmethod
     def concatenate_files_randomized(
         file_list: list[dict[str, Any]],
         output_path: Path,
         quality: str = "192",
+        seed: int | None = None,
     ) -> dict[str, Any]:
         """
         Concatenate multiple audio files into a single MP3 file in randomized order.
@@ -152,6 +354,7 @@ class AudioConcatenator:
             file_list: List of file info dictionaries with 'path' and 'duration'
             output_path: Path for the output concatenated file
             quality: MP3 quality in kbps
+            seed: Optional seed to make the shuffle reproducible
 
         Returns:
             Dictionary with concatenation info including timestamps and shuffled order
@@ -159,12 +362,14 @@ class AudioConcatenator:
         if not file_list:
             raise ValueError("No files to concatenate")
 
-        # Create a shuffled copy of the file list
-        shuffled_list = file_list.copy()
-        random.shuffle(shuffled_list)
+        # Shuffle an index permutation so the order is reproducible for a given seed
+        rng = random.Random(seed)
+        idx = list(range(len(file_list)))
+        rng.shuffle(idx)
+        shuffled_list = [file_list[i] for i in idx]
 
         # Use the regular concatenation with the shuffled list
-        result = AudioConcatenator.concatenate_files(shuffled_list, output_path, quality)
+        result = AudioConcatenator.concatenate_files_parallel(shuffled_list, output_path, quality)
 
         # Add the shuffled order to the result
         result["shuffled_order"] = shuffled_list
@@ -188,32 +393,31 @@ class AudioConcatenator:
         Returns:
             Path to the created track listing file
         """
-        lines = []
-
-        # Header
-        lines.append("=" * 80)
-        lines.append("RANDOMIZED TRACK LISTING")
-        lines.append("=" * 80)
-        lines.append("")
-        lines.append(f"Playlist: {playlist_title}")
-        lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        lines.append(f"Total Duration: {AudioConcatenator._format_timestamp(concat_info['total_duration'])}")
-        lines.append("")
-        lines.append("=" * 80)
-        lines.append("TRACK ORDER")
-        lines.append("=" * 80)
-        lines.append("")
-
-        for ts in concat_info["timestamps"]:
-            lines.append(f"{ts['track_number']:3d}. {ts['title']}")
-            lines.append(f"     [{ts['start_formatted']} - {ts['end_formatted']}]")
-            lines.append("")
-
-        # Footer
-        lines.append("=" * 80)
-        lines.append("Generated by StreamsToFiles")
-        lines.append("=" * 80)
-
-        output_path.write_text("\n".join(lines), encoding="utf-8")
+        with output_path.open("w", encoding="utf-8", buffering=65536) as f:
+            # Header
+            f.write("=" * 80 + "\n")
+            f.write("RANDOMIZED TRACK LISTING\n")
+            f.write("=" * 80 + "\n")
+            f.write("\n")
+            f.write(f"Playlist: {playlist_title}\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Total Duration: {AudioConcatenator._format_timestamp(concat_info['total_duration'])}\n")
+            f.write("\n")
+            f.write("=" * 80 + "\n")
+            f.write("TRACK ORDER\n")
+            f.write("=" * 80 + "\n")
+            f.write("\n")
+
+            for ts in concat_info["timestamps"]:
+                f.write(
+                    f"{ts['track_number']:3d}. {ts['title']}\n"
+                    f"     [{ts['start_formatted']} - {ts['end_formatted']}]\n"
+                    "\n"
+                )
+
+            # Footer
+            f.write("=" * 80 + "\n")
+            f.write("Generated by StreamsToFiles\n")
+            f.write("=" * 80)
 
         return output_path
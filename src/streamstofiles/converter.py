@@ -1,11 +1,18 @@
 """ID3 tag management for MP3 files."""
 
+import hashlib
 from pathlib import Path
 from typing import Any
 
-from mutagen.id3 import APIC, COMM, TALB, TIT2, TPE1, TRCK, ID3
+from mutagen.id3 import APIC, COMM, TALB, TIT2, TPE1, TRCK, TXXX, ID3
 from mutagen.mp3 import MP3
 
+# Minimum padding reserved after the ID3 tag when the file has to be rewritten
+ID3_PADDING = 4096
+
+# Largest thumbnail embedded as album art, in bytes
+MAX_ALBUM_ART_SIZE = 1024 * 1024
+
 
 class ID3Tagger:
     """Manages ID3 tags for MP3 files."""
@@ -15,6 +22,9 @@ class ID3Tagger:
         """
         Update ID3 tags for an MP3 file.
 
+        Tags are normally embedded by the downloader while ffmpeg writes the file,
+        so this only rewrites the file when the metadata asks for an override.
+
         Args:
             file_path: Path to the MP3 file
             metadata: Dictionary containing:
@@ -25,7 +35,14 @@ class ID3Tagger:
                 - total_tracks: Total number of tracks
                 - url: Optional YouTube URL to store in comment field
                 - thumbnail_path: Optional path to thumbnail image for album art
+                - needs_override: Rewrite the tags; without it this is a no-op
+
+        Raises:
+            RuntimeError: If the file can't be read or the tags can't be saved
         """
+        if not metadata.get("needs_override"):
+            return
+
         try:
             # Load the MP3 file
             audio = MP3(file_path, ID3=ID3)
@@ -34,59 +51,79 @@ class ID3Tagger:
             if audio.tags is None:
                 audio.add_tags()
 
-            # Set title
-            audio.tags.add(TIT2(encoding=3, text=metadata["title"]))
-
-            # Set artist
-            audio.tags.add(TPE1(encoding=3, text=metadata["artist"]))
-
-            # Set album
-            audio.tags.add(TALB(encoding=3, text=metadata["album"]))
-
-            # Set track number in format "track/total"
-            track_str = f"{metadata['track_number']}/{metadata['total_tracks']}"
-            audio.tags.add(TRCK(encoding=3, text=track_str))
+            # Build every frame first, then replace them in a single pass
+            frames = [
+                TIT2(encoding=3, text=metadata["title"]),
+                TPE1(encoding=3, text=metadata["artist"]),
+                TALB(encoding=3, text=metadata["album"]),
+                # Track number in format "track/total"
+                TRCK(encoding=3, text=f"{metadata['track_number']}/{metadata['total_tracks']}"),
+            ]
 
             # Add YouTube URL as a comment if provided
             if "url" in metadata and metadata["url"]:
-                audio.tags.add(
+                frames.append(
                     COMM(encoding=3, lang="eng", desc="YouTube URL", text=metadata["url"])
                 )
 
+            for frame in frames:
+                audio.tags.setall(frame.HashKey, [frame])
+
+            # Reserve padding so later tag edits fit in place without rewriting the audio
+            padding = ID3_PADDING
+
             # Add album art if thumbnail path is provided
             if "thumbnail_path" in metadata and metadata["thumbnail_path"]:
                 thumbnail_path = Path(metadata["thumbnail_path"])
                 if thumbnail_path.exists():
-                    ID3Tagger._add_album_art(audio, thumbnail_path)
+                    img_size = ID3Tagger._add_album_art(audio, thumbnail_path)
+                    # Leave room to swap the cover for a similar-sized one
+                    if img_size >= ID3_PADDING:
+                        padding = img_size + 8192
 
-            # Save the tags
-            audio.save()
+            # Save the tags, in place when they still fit in the existing tag block
+            audio.save(padding=lambda info: info.padding if info.padding >= 0 else padding)
 
         except Exception as e:
-            print(f"Error updating ID3 tags for {file_path}: {e}")
+            # Raise a plain RuntimeError so it pickles back from worker processes
+            raise RuntimeError(f"{type(e).__name__}: {e}") from e
 
     @staticmethod
-    def _add_album_art(audio: MP3, thumbnail_path: Path) -> None:
+    def _add_album_art(audio: MP3, thumbnail_path: Path) -> int:
         """
-        Add album art to the MP3 file.
+        Add album art to the MP3 file, unless the same cover is already embedded.
 
         Args:
             audio: MP3 file object
             thumbnail_path: Path to the thumbnail image
+
+        Returns:
+            Size of the embedded image in bytes, or 0 if it was skipped
         """
-        # Determine MIME type based on file extension
-        ext = thumbnail_path.suffix.lower()
-        mime_types = {
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".png": "image/png",
-            ".webp": "image/webp",
-        }
-        mime = mime_types.get(ext, "image/jpeg")
+        # Large covers bloat the ID3 tag and slow down every save
+        img_size = thumbnail_path.stat().st_size
+        if img_size > MAX_ALBUM_ART_SIZE:
+            print(f"Warning: Skipping album art {thumbnail_path.name} ({img_size} bytes exceeds {MAX_ALBUM_ART_SIZE})")
+            return 0
 
         # Read the image data
-        with open(thumbnail_path, "rb") as img_file:
-            img_data = img_file.read()
+        img_data = thumbnail_path.read_bytes()
+
+        # The cover's hash is stored alongside it, so an unchanged cover
+        # is detected without re-hashing the embedded image
+        cover_hash = hashlib.blake2b(img_data, digest_size=16).hexdigest()
+        stored_hash = audio.tags.get("TXXX:cover_hash")
+        if stored_hash and str(stored_hash) == cover_hash and audio.tags.getall("APIC"):
+            return len(img_data)
+
+        # Determine MIME type based on file extension
+        ext = thumbnail_path.suffix.lower()
+        if ext == ".png":
+            mime = "image/png"
+        elif ext == ".webp":
+            mime = "image/webp"
+        else:
+            mime = "image/jpeg"
 
         # Add as front cover
         audio.tags.add(
@@ -98,39 +135,98 @@ class ID3Tagger:
                 data=img_data,
             )
         )
+        audio.tags.add(TXXX(encoding=3, desc="cover_hash", text=cover_hash))
+
+        return len(img_data)
 
     @staticmethod
-    def verify_tags(file_path: Path) -> dict[str, Any]:
+    def verify_tags(
+        file_path: Path,
+        use_tinytag: bool = True,
+        check_artwork: bool = False,
+    ) -> dict[str, Any]:
         """
         Verify and return the ID3 tags from an MP3 file.
 
+        Uses the lightweight tinytag reader when it is installed, falling back
+        to mutagen otherwise.
+
         Args:
             file_path: Path to the MP3 file
+            use_tinytag: Read tags with tinytag if available (default: enabled)
+            check_artwork: Also report whether album art is embedded, which
+                requires loading the image data (default: disabled)
 
         Returns:
             Dictionary with tag information
         """
+        if use_tinytag:
+            try:
+                return ID3Tagger._verify_tags_tinytag(file_path, check_artwork)
+            except Exception:
+                # tinytag is optional, or could not parse the file
+                pass
+
         try:
             audio = MP3(file_path, ID3=ID3)
 
             if audio.tags is None:
                 return {"error": "No ID3 tags found"}
 
-            # Extract comment/URL if present
-            comment = ""
-            if "COMM:YouTube URL:eng" in audio.tags:
-                comment = str(audio.tags["COMM:YouTube URL:eng"])
-
+            frames = audio.tags
+            # update_tags writes the URL as a "YouTube URL" comment, while ffmpeg's
+            # comment metadata during download has no description
+            comments = {comment.desc: comment for comment in frames.getall("COMM")}
             tags = {
-                "title": str(audio.tags.get("TIT2", "")),
-                "artist": str(audio.tags.get("TPE1", "")),
-                "album": str(audio.tags.get("TALB", "")),
-                "track": str(audio.tags.get("TRCK", "")),
-                "url": comment,
-                "has_artwork": "APIC:" in audio.tags,
+                "title": str(frames.get("TIT2", "")),
+                "artist": str(frames.get("TPE1", "")),
+                "album": str(frames.get("TALB", "")),
+                "track": str(frames.get("TRCK", "")),
+                # Extract comment/URL if present
+                "url": str(comments.get("YouTube URL", comments.get("", ""))),
             }
+            if check_artwork:
+                tags["has_artwork"] = bool(frames.getall("APIC"))
 
             return tags
 
         except Exception as e:
             return {"error": str(e)}
+
+    @staticmethod
+    def _verify_tags_tinytag(file_path: Path, check_artwork: bool) -> dict[str, Any]:
+        """
+        Read tags with tinytag, which skips mutagen's full frame parsing.
+
+        Args:
+            file_path: Path to the MP3 file
+            check_artwork: Also report whether album art is embedded
+
+        Returns:
+            Dictionary with tag information
+        """
+        from tinytag import TinyTag
+
+        tag = TinyTag.get(file_path, image=check_artwork)
+
+        if tag.title is None and tag.artist is None and tag.album is None and tag.track is None:
+            return {"error": "No ID3 tags found"}
+
+        track = ""
+        if tag.track is not None:
+            track = f"{tag.track}/{tag.track_total}" if tag.track_total else str(tag.track)
+
+        # tinytag reports comments with a description under their lowercased description
+        url = tag.other.get("youtube url", [tag.comment or ""])[0]
+
+        tags = {
+            "title": tag.title or "",
+            "artist": tag.artist or "",
+            "album": tag.album or "",
+            "track": track,
+            "url": url,
+        }
+        if check_artwork:
+            tags["has_artwork"] = tag.images.any is not None
+
+        return tags
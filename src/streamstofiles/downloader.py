@@ -1,15 +1,40 @@
 """YouTube playlist downloading using yt-dlp."""
 
+import functools
+import os
+import random
 import shutil
+import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import yt_dlp
 
-from .utils import ensure_directory, format_track_number, sanitize_filename
+from .cache import MetadataCache
+from .utils import ensure_directory, format_track_number, sanitize_filename, track_number_width
 
+# Spacing between download starts: a short polite gap normally, and a longer one
+# (plus random jitter) while recovering from rate limiting
+POLITE_SPACING = 0.25
+DOWNLOAD_SPACING = 3.0
+DOWNLOAD_JITTER = 1.0
 
+# How long after a rate-limit error the longer spacing stays in effect, in seconds
+RATE_LIMIT_COOLDOWN = 300.0
+
+# Playlist and entry fields kept in the playlist info cache; the rest of yt-dlp's
+# info (formats with expiring URLs, etc.) is large and never read
+PLAYLIST_INFO_FIELDS = ("title", "availability", "uploader")
+ENTRY_INFO_FIELDS = ("id", "webpage_url", "url", "title", "uploader", "channel", "duration")
+
+# Minimum time between progress updates for one download, in seconds
+PROGRESS_INTERVAL = 0.1
+
+
+@functools.lru_cache(maxsize=1)
 def _detect_node_path() -> str | None:
     """Detect Node.js path for yt-dlp JS runtime."""
     node_path = shutil.which("node")
@@ -18,6 +43,7 @@ def _detect_node_path() -> str | None:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def _detect_cookies_file() -> Path | None:
     """Detect cookies.txt in the project root."""
     # Try common locations for the cookies file
@@ -34,23 +60,58 @@ def _detect_cookies_file() -> Path | None:
 class PlaylistDownloader:
     """Downloads YouTube playlists and converts to MP3."""
 
-    def __init__(self, output_dir: Path, quality: str = "192"):
+    def __init__(
+        self,
+        output_dir: Path,
+        quality: str = "192",
+        max_workers: int = 4,
+        force_redownload: bool = False,
+        refresh_playlist: bool = False,
+    ):
         """
         Initialize the downloader.
 
         Args:
             output_dir: Base directory for output files
             quality: MP3 quality in kbps (default: 192)
+            max_workers: Maximum number of videos to download concurrently (default: 4)
+            force_redownload: Download tracks even if their MP3 already exists,
+                implies refresh_playlist (default: False)
+            refresh_playlist: Fetch playlist info even if a cached copy exists (default: False)
         """
         self.output_dir = Path(output_dir)
         self.quality = quality
-
-    def download_playlist(self, playlist_url: str) -> dict[str, Any]:
+        self.max_workers = max_workers
+        self.force_redownload = force_redownload
+        self.refresh_playlist = refresh_playlist or force_redownload
+        self._throttle_lock = threading.Lock()
+        self._next_start = 0.0
+        self._recent_rate_limit_ts = float("-inf")
+        self._last_progress_ts: dict[str, float] = {}
+        self.playlist_cache = MetadataCache(self.output_dir / ".cache" / "playlists")
+        self._ydl_opts: dict[str, Any] = {}
+        self._ydl_local = threading.local()
+        self._ydl_pool: list[yt_dlp.YoutubeDL] = []
+        self._ydl_pool_lock = threading.Lock()
+
+    @classmethod
+    def reset_env_cache(cls) -> None:
+        """Forget the detected cookies file and Node.js path so they are looked up again."""
+        _detect_cookies_file.cache_clear()
+        _detect_node_path.cache_clear()
+
+    def download_playlist(
+        self,
+        playlist_url: str,
+        on_file: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
         """
         Download a YouTube playlist and convert to MP3 files.
 
         Args:
             playlist_url: URL of the YouTube playlist
+            on_file: Optional callback invoked with each file info dictionary
+                as soon as that track has been downloaded
 
         Returns:
             Dictionary containing playlist info and downloaded file paths
@@ -93,34 +154,67 @@ class PlaylistDownloader:
             playlist_title = info.get("uploader", "Single_Video")
 
         total_tracks = len(entries)
+        width = track_number_width(total_tracks)
 
         # Create sanitized directory name
         sanitized_title = sanitize_filename(playlist_title)
         playlist_dir = ensure_directory(self.output_dir / sanitized_title)
 
-        # Download each video with proper numbering
-        downloaded_files = []
-        for idx, entry in enumerate(entries, start=1):
-            # Add delay between downloads to avoid rate limiting (skip first)
-            if idx > 1:
-                print("Waiting 3 seconds before next download...")
-                time.sleep(3)
-
-            # Get video URL - prefer webpage_url, fallback to constructing from id
-            video_url = entry.get("webpage_url") or entry.get("url") or f"https://www.youtube.com/watch?v={entry['id']}"
-
-            track_num = format_track_number(idx, total_tracks)
-            file_info = self._download_video(
-                video_url,
-                playlist_dir,
-                track_num,
-                entry,
-                playlist_title,
-                idx,
-                total_tracks,
-            )
-            if file_info:
-                downloaded_files.append(file_info)
+        # Options shared by every video; each worker thread reuses one YoutubeDL built from them
+        self._ydl_opts = self._build_base_ydl_opts()
+
+        try:
+            # Download videos concurrently, each with its playlist position as track number
+            downloaded_files = []
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, total_tracks))) as executor:
+                try:
+                    futures = []
+                    for idx, entry in enumerate(entries, start=1):
+                        # Get video URL - prefer webpage_url, fallback to constructing from id
+                        video_url = entry.get("webpage_url") or entry.get("url") or f"https://www.youtube.com/watch?v={entry['id']}"
+
+                        track_num = format_track_number(idx, width)
+
+                        # A previous run already completed this track, don't download it again.
+                        # Interrupted or failed downloads never reach the final name, so they are retried.
+                        # Checked before scheduling so cached tracks don't wait for a download slot
+                        mp3_path = self._track_path(playlist_dir, track_num, entry)
+                        if self._is_downloaded(mp3_path):
+                            print(f"Skipping (cached): {mp3_path.name}")
+                            future = Future()
+                            future.set_result(self._build_file_info(
+                                mp3_path, entry, video_url, playlist_title, idx, total_tracks
+                            ))
+                            futures.append(future)
+                            continue
+
+                        futures.append(executor.submit(
+                            self._download_video_throttled,
+                            video_url,
+                            playlist_dir,
+                            track_num,
+                            entry,
+                            playlist_title,
+                            idx,
+                            total_tracks,
+                        ))
+
+                    for future in as_completed(futures):
+                        file_info = future.result()
+                        if file_info:
+                            downloaded_files.append(file_info)
+                            if on_file:
+                                on_file(file_info)
+                except BaseException:
+                    # Leaving the with block would wait for every queued video;
+                    # drop the queue so Ctrl-C stops after the in-flight downloads
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+        finally:
+            self._close_ydls()
+
+        # Downloads finish out of order, restore playlist order
+        downloaded_files.sort(key=lambda f: f["track_number"])
 
         return {
             "playlist_title": playlist_title,
@@ -130,64 +224,75 @@ class PlaylistDownloader:
         }
 
     def _get_playlist_info(self, playlist_url: str) -> dict[str, Any]:
-        """Get playlist information without downloading."""
-        ydl_opts = {
+        """Get playlist information without downloading, reusing a recent cached copy."""
+        if not self.refresh_playlist:
+            cached = self.playlist_cache.get(playlist_url)
+            if cached is not None:
+                print("Using cached playlist info", flush=True)
+                return cached
+
+        ydl_opts = self._add_env_opts({
             "quiet": True,
             "extract_flat": False,
             "no_warnings": False,
-            # Enable remote JS challenge solver from GitHub
-            "remote_components": ["ejs:github"],
-        }
-
-        # Add cookies file if present
-        cookies_path = _detect_cookies_file()
-        if cookies_path:
-            ydl_opts["cookiefile"] = str(cookies_path)
-
-        # Add JS runtime if Node.js is available
-        node_path = _detect_node_path()
-        if node_path:
-            ydl_opts["js_runtimes"] = {"node": {"path": node_path}}
+        })
 
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             info = ydl.extract_info(playlist_url, download=False)
+            info = self._slim_playlist_info(ydl.sanitize_info(info))
 
+        self.playlist_cache.set(playlist_url, info)
         return info
 
-    def _download_video(
-        self,
-        video_url: str,
-        output_dir: Path,
-        track_num: str,
-        entry: dict[str, Any],
-        playlist_title: str,
-        track_index: int,
-        total_tracks: int,
-    ) -> dict[str, Any] | None:
+    @staticmethod
+    def _slim_playlist_info(info: dict[str, Any]) -> dict[str, Any]:
         """
-        Download a single video and convert to MP3.
+        Keep only the playlist info fields download_playlist reads.
 
         Args:
-            video_url: URL of the video
-            output_dir: Directory to save the file
-            track_num: Formatted track number (e.g., "01", "02")
-            entry: Video entry info from playlist
-            playlist_title: Title of the playlist
-            track_index: Track number (1-indexed)
-            total_tracks: Total number of tracks
+            info: Playlist (or single video) info from yt-dlp
 
         Returns:
-            Dictionary with file info or None if download failed
+            Copy of the info with just the needed playlist and entry fields
         """
-        video_title = entry.get("title", "Unknown")
-        uploader = entry.get("uploader", entry.get("channel", "Unknown"))
-        duration = entry.get("duration", 0)
-        sanitized_title = sanitize_filename(video_title, max_length=80)
+        if "entries" not in info:
+            # Single video, its fields are read as the only entry
+            fields = PLAYLIST_INFO_FIELDS + ENTRY_INFO_FIELDS
+            return {key: info[key] for key in fields if key in info}
+
+        slim = {key: info[key] for key in PLAYLIST_INFO_FIELDS if key in info}
+        slim["entries"] = [
+            {key: entry[key] for key in ENTRY_INFO_FIELDS if key in entry} if entry is not None else None
+            for entry in info["entries"]
+        ]
+        return slim
+
+    def _wait_for_turn(self) -> None:
+        """Space out download starts across workers, backing off after rate limiting."""
+        with self._throttle_lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            if now - self._recent_rate_limit_ts < RATE_LIMIT_COOLDOWN:
+                spacing = DOWNLOAD_SPACING + random.uniform(0, DOWNLOAD_JITTER)
+            else:
+                spacing = POLITE_SPACING
+            self._next_start = start + spacing
+
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def _build_base_ydl_opts(self) -> dict[str, Any]:
+        """
+        Build the yt-dlp options shared by every video download.
 
-        # Output template with track number prefix
-        output_template = str(output_dir / f"{track_num}-{sanitized_title}.%(ext)s")
+        Per-video settings (output template and metadata) are applied to the
+        pooled YoutubeDL instance before each download.
 
-        ydl_opts = {
+        Returns:
+            Dictionary of yt-dlp options
+        """
+        return self._add_env_opts({
             "format": "bestaudio/best",
             "postprocessors": [
                 {
@@ -202,14 +307,25 @@ class PlaylistDownloader:
                     "key": "EmbedThumbnail",
                 },
             ],
-            # Enable remote JS challenge solver from GitHub
-            "remote_components": ["ejs:github"],
             "writethumbnail": True,
-            "outtmpl": output_template,
             "quiet": False,
             "no_warnings": False,
             "progress_hooks": [self._progress_hook],
-        }
+        })
+
+    @staticmethod
+    def _add_env_opts(ydl_opts: dict[str, Any]) -> dict[str, Any]:
+        """
+        Add the options that depend on the local environment.
+
+        Args:
+            ydl_opts: yt-dlp options to extend
+
+        Returns:
+            The same options dictionary
+        """
+        # Enable remote JS challenge solver from GitHub
+        ydl_opts["remote_components"] = ["ejs:github"]
 
         # Add cookies file if present
         cookies_path = _detect_cookies_file()
@@ -221,35 +337,105 @@ class PlaylistDownloader:
         if node_path:
             ydl_opts["js_runtimes"] = {"node": {"path": node_path}}
 
+        return ydl_opts
+
+    def _get_ydl(self) -> yt_dlp.YoutubeDL:
+        """Get this worker thread's YoutubeDL, creating it on first use."""
+        ydl = getattr(self._ydl_local, "ydl", None)
+        if ydl is None:
+            # YoutubeDL keeps and mutates its params dict, so give each one its own outtmpl
+            ydl = yt_dlp.YoutubeDL({**self._ydl_opts, "outtmpl": {}})
+            self._ydl_local.ydl = ydl
+            with self._ydl_pool_lock:
+                self._ydl_pool.append(ydl)
+        return ydl
+
+    def _close_ydls(self) -> None:
+        """Close every pooled YoutubeDL instance."""
+        with self._ydl_pool_lock:
+            for ydl in self._ydl_pool:
+                ydl.close()
+            self._ydl_pool.clear()
+        self._ydl_local = threading.local()
+
+    def _download_video_throttled(self, *args: Any) -> dict[str, Any] | None:
+        """Wait for a download slot, then download a single video."""
+        self._wait_for_turn()
+        return self._download_video(*args)
+
+    def _download_video(
+        self,
+        video_url: str,
+        output_dir: Path,
+        track_num: str,
+        entry: dict[str, Any],
+        playlist_title: str,
+        track_index: int,
+        total_tracks: int,
+    ) -> dict[str, Any] | None:
+        """
+        Download a single video and convert to MP3.
+
+        Args:
+            video_url: URL of the video
+            output_dir: Directory to save the file
+            track_num: Formatted track number (e.g., "01", "02")
+            entry: Video entry info from playlist
+            playlist_title: Title of the playlist
+            track_index: Track number (1-indexed)
+            total_tracks: Total number of tracks
+
+        Returns:
+            Dictionary with file info or None if download failed
+        """
+        video_title = entry.get("title", "Unknown")
+        uploader = entry.get("uploader", entry.get("channel", "Unknown"))
+        mp3_path = self._track_path(output_dir, track_num, entry)
+
+        # yt-dlp converts into the final file in place and leaves it behind when a later
+        # step fails, so work on a ".part" name and only rename it once everything succeeded
+        part_path = mp3_path.with_name(f"{mp3_path.stem}.part.mp3")
+        output_template = str(part_path.with_suffix(".%(ext)s"))
+
         max_retries = 3
         retry_delays = [10, 20, 30]  # Increasing delays for each retry
 
         for attempt in range(max_retries):
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(video_url, download=True)
-
-                mp3_path = output_dir / f"{track_num}-{sanitized_title}.mp3"
+                # Don't let a leftover from an interrupted attempt pass as this one's output
+                part_path.unlink(missing_ok=True)
+                ydl = self._get_ydl()
+                ydl.params["outtmpl"]["default"] = output_template
+                # Write ID3 tags while ffmpeg muxes the file, so it isn't rewritten afterwards
+                ydl.params["postprocessor_args"] = {
+                    "ffmpegmetadata": [
+                        "-metadata", f"title={video_title}",
+                        "-metadata", f"artist={uploader}",
+                        "-metadata", f"album={playlist_title}",
+                        "-metadata", f"track={track_index}/{total_tracks}",
+                        "-metadata", f"comment={video_url}",
+                    ],
+                }
+                ydl.extract_info(video_url, download=True)
 
                 # Verify the MP3 file was actually created
-                if not mp3_path.exists():
+                if not part_path.exists():
                     print(f"Warning: Audio extraction failed for '{video_title}' - MP3 file not created")
                     return None
+                os.replace(part_path, mp3_path)
 
-                return {
-                    "path": mp3_path,
-                    "title": video_title,
-                    "artist": uploader,
-                    "album": playlist_title,
-                    "track_number": track_index,
-                    "total_tracks": total_tracks,
-                    "duration": duration,
-                    "url": video_url,
-                }
+                return self._build_file_info(
+                    mp3_path, entry, video_url, playlist_title, track_index, total_tracks
+                )
 
             except Exception as e:
                 error_str = str(e)
-                is_rate_limit = "403" in error_str or "Forbidden" in error_str
+                is_rate_limit = any(s in error_str for s in ("403", "Forbidden", "429", "Too Many Requests"))
+
+                if is_rate_limit:
+                    # Slow down every worker's next downloads, not just this retry
+                    with self._throttle_lock:
+                        self._recent_rate_limit_ts = time.monotonic()
 
                 if is_rate_limit and attempt < max_retries - 1:
                     delay = retry_delays[attempt]
@@ -257,15 +443,92 @@ class PlaylistDownloader:
                     time.sleep(delay)
                 else:
                     print(f"Error downloading {video_title}: {e}")
+                    part_path.unlink(missing_ok=True)
                     return None
 
+    def _is_downloaded(self, mp3_path: Path) -> bool:
+        """
+        Check whether a track's MP3 already exists from a previous run.
+
+        Args:
+            mp3_path: Path to the track's MP3 file
+
+        Returns:
+            True if the file exists, unless force_redownload is set
+        """
+        if self.force_redownload:
+            return False
+        # Downloads are renamed to the final name only once they completed, so
+        # an MP3 under that name is a finished track
+        return mp3_path.is_file()
+
+    @staticmethod
+    def _track_path(output_dir: Path, track_num: str, entry: dict[str, Any]) -> Path:
+        """
+        Get the MP3 path for a playlist entry.
+
+        Args:
+            output_dir: Directory where the file is saved
+            track_num: Formatted track number (e.g., "01", "02")
+            entry: Video entry info from playlist
+
+        Returns:
+            Path like "01-Video_Title.mp3"
+        """
+        sanitized_title = sanitize_filename(entry.get("title", "Unknown"), max_length=80)
+        return output_dir / f"{track_num}-{sanitized_title}.mp3"
+
+    @staticmethod
+    def _build_file_info(
+        mp3_path: Path,
+        entry: dict[str, Any],
+        video_url: str,
+        playlist_title: str,
+        track_index: int,
+        total_tracks: int,
+    ) -> dict[str, Any]:
+        """
+        Build the file info dictionary for a downloaded track.
+
+        Args:
+            mp3_path: Path to the MP3 file
+            entry: Video entry info from playlist
+            video_url: URL of the video
+            playlist_title: Title of the playlist
+            track_index: Track number (1-indexed)
+            total_tracks: Total number of tracks
+
+        Returns:
+            Dictionary with file info
+        """
+        return {
+            "path": mp3_path,
+            "abs_path_str": str(mp3_path.absolute()),
+            "name": mp3_path.name,
+            "title": entry.get("title", "Unknown"),
+            "artist": entry.get("uploader", entry.get("channel", "Unknown")),
+            "album": playlist_title,
+            "track_number": track_index,
+            "total_tracks": total_tracks,
+            "duration": entry.get("duration", 0),
+            "url": video_url,
+        }
+
     def _progress_hook(self, d: dict[str, Any]) -> None:
-        """Hook for download progress updates."""
+        """Hook for download progress updates, throttled per download."""
+        # Extract filename from path
+        filename = Path(d.get("filename", "")).name
         if d["status"] == "downloading":
-            # Extract filename from path
-            filename = Path(d.get("filename", "")).name
+            # yt-dlp calls this many times a second; only redraw every PROGRESS_INTERVAL
+            now = time.monotonic()
+            if now - self._last_progress_ts.get(filename, float("-inf")) < PROGRESS_INTERVAL:
+                return
+            self._last_progress_ts[filename] = now
             percent = d.get("_percent_str", "N/A")
             speed = d.get("_speed_str", "N/A")
-            print(f"\rDownloading {filename}: {percent} at {speed}", end="", flush=True)
+            sys.stdout.write(f"\rDownloading {filename}: {percent} at {speed}")
+            sys.stdout.flush()
         elif d["status"] == "finished":
-            print("\nProcessing audio...")
+            self._last_progress_ts.pop(filename, None)
+            sys.stdout.write("\nProcessing audio...\n")
+            sys.stdout.flush()
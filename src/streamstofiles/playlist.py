@@ -1,5 +1,7 @@
 """M3U playlist generation."""
 
+import io
+import os
 from pathlib import Path
 from typing import Any
 
@@ -26,26 +28,40 @@ class PlaylistGenerator:
         Returns:
             Path to the created m3u file
         """
-        playlist_lines = ["#EXTM3U\n"]
+        # EXTINF line with duration and display info, then the file path
+        # (just the filename, since the playlist is in the same directory)
+        body = "".join(
+            f"#EXTINF:{file_info.get('duration', -1)},"
+            f"{file_info.get('artist', 'Unknown')} - {file_info.get('title', 'Unknown')}\n"
+            f"{PlaylistGenerator._file_name(file_info)}\n"
+            for file_info in files
+        )
+
+        # Write to a temp file and swap it in, so a crash never leaves a truncated playlist
+        tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8", buffering=io.DEFAULT_BUFFER_SIZE) as f:
+            f.write("#EXTM3U\n")
+            f.write(body)
+        os.replace(tmp_path, output_path)
 
-        for file_info in files:
-            path = Path(file_info["path"])
-            title = file_info.get("title", "Unknown")
-            artist = file_info.get("artist", "Unknown")
-            duration = file_info.get("duration", -1)
-
-            # Add EXTINF line with duration and display info
-            display_name = f"{artist} - {title}"
-            playlist_lines.append(f"#EXTINF:{duration},{display_name}\n")
+        return output_path
 
-            # Add file path (relative to playlist location)
-            # Use just the filename since playlist is in the same directory
-            playlist_lines.append(f"{path.name}\n")
+    @staticmethod
+    def _file_name(file_info: dict[str, Any]) -> str:
+        """
+        Get the file name for a track without re-wrapping existing Path objects.
 
-        # Write the playlist file
-        output_path.write_text("".join(playlist_lines), encoding="utf-8")
+        Args:
+            file_info: File info dictionary with 'path' and optionally 'name'
 
-        return output_path
+        Returns:
+            File name of the track
+        """
+        name = file_info.get("name")
+        if name:
+            return name
+        path = file_info["path"]
+        return path.name if isinstance(path, Path) else Path(path).name
 
     @staticmethod
     def verify_playlist(playlist_path: Path) -> dict[str, Any]:
@@ -62,14 +78,14 @@ class PlaylistGenerator:
             return {"error": "Playlist file not found"}
 
         try:
-            content = playlist_path.read_text(encoding="utf-8")
-            lines = content.strip().split("\n")
-
-            if not lines or not lines[0].startswith("#EXTM3U"):
-                return {"error": "Invalid m3u format"}
-
-            # Count tracks
-            track_count = sum(1 for line in lines if line and not line.startswith("#"))
+            # Stream the file line by line rather than loading it whole
+            with playlist_path.open("r", encoding="utf-8") as fh:
+                first = fh.readline()
+                if not first.startswith("#EXTM3U"):
+                    return {"error": "Invalid m3u format"}
+
+                # Count tracks
+                track_count = sum(1 for line in fh if line.strip() and not line.startswith("#"))
 
             return {
                 "valid": True,
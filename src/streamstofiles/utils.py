@@ -3,6 +3,15 @@
 import re
 from pathlib import Path
 
+# Maps characters that are invalid in filenames, plus spaces, to underscores
+_TRANSLATE_TABLE = str.maketrans({c: '_' for c in '/\\:*?"<>| '})
+
+# Runs of consecutive underscores
+_MULTI_UNDERSCORE = re.compile(r'_+')
+
+# Directories already known to exist, so repeat calls skip the filesystem
+_known_dirs: set[Path] = set()
+
 
 def sanitize_filename(name: str, max_length: int = 100) -> str:
     """
@@ -15,14 +24,11 @@ def sanitize_filename(name: str, max_length: int = 100) -> str:
     Returns:
         A sanitized filename safe for filesystem use
     """
-    # Replace invalid characters with underscores
-    sanitized = re.sub(r'[/\\:*?"<>|]', '_', name)
-
-    # Replace spaces with underscores
-    sanitized = sanitized.replace(' ', '_')
+    # Replace invalid characters and spaces with underscores
+    sanitized = name.translate(_TRANSLATE_TABLE)
 
     # Remove multiple consecutive underscores
-    sanitized = re.sub(r'_+', '_', sanitized)
+    sanitized = _MULTI_UNDERSCORE.sub('_', sanitized)
 
     # Remove leading/trailing underscores
     sanitized = sanitized.strip('_')
@@ -44,21 +50,36 @@ def ensure_directory(path: Path) -> Path:
     Returns:
         The path (as a Path object)
     """
-    path.mkdir(parents=True, exist_ok=True)
+    if path in _known_dirs:
+        return path
+    if not path.is_dir():
+        path.mkdir(parents=True, exist_ok=True)
+    _known_dirs.add(path)
     return path
 
 
-def format_track_number(track_num: int, total_tracks: int) -> str:
+def track_number_width(total_tracks: int) -> int:
     """
-    Format a track number with leading zeros based on total track count.
+    Get the number of digits needed to number every track in a playlist.
 
     Args:
-        track_num: The track number (1-indexed)
         total_tracks: Total number of tracks in the playlist
 
+    Returns:
+        Width for zero-padded track numbers (e.g., 2 for 10-99 tracks)
+    """
+    return len(str(total_tracks))
+
+
+def format_track_number(track_num: int, width: int) -> str:
+    """
+    Format a track number with leading zeros.
+
+    Args:
+        track_num: The track number (1-indexed)
+        width: Number of digits, from track_number_width()
+
     Returns:
         Formatted track number string (e.g., "01", "02", "123")
     """
-    # Determine how many digits we need
-    digits = len(str(total_tracks))
-    return str(track_num).zfill(digits)
+    return f"{track_num:0{width}d}"